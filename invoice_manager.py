@@ -13,7 +13,7 @@ Features:
 - Basic automation: auto-numbering invoices and optional email sending stub
 
 Dependencies (standard library): tkinter, sqlite3, csv, datetime, os, tempfile, webbrowser
-Optional dependencies (pip install): pandas (for nicer exports), reportlab (for PDF generation)
+Optional dependencies (pip install): reportlab (for PDF generation)
 
 Run: python invoice_manager.py
 
@@ -23,36 +23,180 @@ This single file contains everything you need for a simple invoice manager.
 import os
 import sqlite3
 import csv
+import io
+import queue
+import threading
+import json
 import tempfile
 import webbrowser
+from contextlib import contextmanager, suppress
 from datetime import datetime
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import lru_cache
+from pathlib import Path
+from xml.sax.saxutils import escape
 from tkinter import *
 from tkinter import ttk, messagebox, filedialog
 
 # Optional imports
-try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
-except Exception:
-    PANDAS_AVAILABLE = False
-
 try:
     from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas as rcanvas
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
     REPORTLAB_AVAILABLE = True
 except Exception:
     REPORTLAB_AVAILABLE = False
 
 DB_FILE = os.path.join(os.path.expanduser('~'), '.invoice_manager.db')
+# UPDATE ... RETURNING needs SQLite 3.35+
+HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
 
 # --- Database helpers ---
+
+def dump_items(lines):
+    # items are stored as a JSON list of lines so readers never re-split the text
+    return json.dumps([ln for ln in lines if ln])
+
+
+def format_cents(cents):
+    # totals are stored as integer cents; render them as a fixed two-decimal amount
+    if cents is None:
+        return ''
+    sign = '-' if cents < 0 else ''
+    cents = abs(cents)
+    return f"{sign}{cents // 100}.{cents % 100:02d}"
+
+
+def parse_cents(text):
+    # exact decimal parse of an amount like '12.34' into integer cents; raises
+    # ValueError for anything that is not a finite amount fitting SQLite's INTEGER
+    try:
+        cents = int((Decimal(text or '0') * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except (InvalidOperation, ValueError):
+        raise ValueError(f'invalid amount: {text!r}') from None
+    if not -2**63 <= cents < 2**63:
+        raise ValueError(f'amount out of range: {text!r}')
+    return cents
+
+
+def load_items(stored):
+    # inverse of dump_items; legacy newline-separated rows are converted by the v3 migration
+    return json.loads(stored) if stored else []
+
+
+def _is_json_list(stored):
+    try:
+        return isinstance(json.loads(stored), list)
+    except ValueError:
+        return False
+
+# columns of a full invoice row (older databases also carry a frozen REAL `total` column)
+INVOICE_COLUMNS = 'id, invoice_no, date, type, customer, items, total_cents, notes'
+
+# WHERE clause pieces for list_invoices, in bind-parameter order.
+# Dates are stored as ISO YYYY-MM-DD, so plain string comparison can use idx_invoices_date.
+LIST_FILTER_CONDS = (
+    ('type', 'type=?'),
+    ('customer', "customer LIKE ? ESCAPE '\\'"),
+    ('invoice_no', "invoice_no LIKE ? ESCAPE '\\'"),
+    ('fts', 'id IN (SELECT rowid FROM invoices_fts WHERE invoices_fts MATCH ?)'),
+    ('date_from', 'date >= ?'),
+    ('date_to', 'date <= ?'),
+)
+
+
+def _like_escape(text):
+    # make % and _ in user input match literally (paired with ESCAPE '\')
+    return text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_searchable(text):
+    # the trigram tokenizer cannot match anything shorter than three characters
+    return len(text) >= 3
+
+
+def _fts_substring_query(column, text):
+    # with tokenize='trigram' a quoted phrase matches as a case-insensitive substring
+    return '%s : "%s"' % (column, text.replace('"', '""'))
+
+
+@lru_cache(maxsize=32)
+def _build_list_sql(shape, paged):
+    # the SQL only depends on which filters are set, so identical searches reuse
+    # the same string (and sqlite3's prepared-statement cache)
+    q = 'SELECT id, invoice_no, date, type, customer, total_cents FROM invoices'
+    conds = [cond for key, cond in LIST_FILTER_CONDS if key in shape]
+    if conds:
+        q += ' WHERE ' + ' AND '.join(conds)
+    q += ' ORDER BY date DESC, id'
+    if paged:
+        q += ' LIMIT ? OFFSET ?'
+    return q
+
+
 class InvoiceDB:
+    # the unfiltered first page is what the app shows at startup and after Reset
+    _SQL_LIST_ALL = ('SELECT id, invoice_no, date, type, customer, total_cents FROM invoices '
+                     'ORDER BY date DESC, id LIMIT ? OFFSET ?')
+
     def __init__(self, db_path=DB_FILE):
-        self.conn = sqlite3.connect(db_path)
+        # autocommit mode; multi-statement writes use explicit transactions.
+        # Writes go through self.conn and are serialized by _write_lock. list_invoices
+        # on other threads uses a thread-local read connection (see _reader), so WAL
+        # gives it a committed snapshot and it never sees an open write transaction.
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self._write_lock = threading.Lock()
+        self._owner = threading.get_ident()
+        self._local = threading.local()
+        # rows are addressable by column name, e.g. row['invoice_no']
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(
+            'PRAGMA journal_mode=WAL;'
+            'PRAGMA synchronous=NORMAL;'
+            'PRAGMA temp_store=MEMORY;'
+            'PRAGMA cache_size=-20000;'
+        )
         self._create_tables()
 
+    def _reader(self):
+        # the owning thread reads through self.conn; an in-memory database is private
+        # to its connection, so it cannot be opened a second time either.
+        # Other threads get a read connection that lives as long as the thread.
+        if threading.get_ident() == self._owner or self.db_path == ':memory:':
+            return self.conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA query_only=ON')
+            # prime this connection's statement cache with the hot no-filter query
+            conn.execute(self._SQL_LIST_ALL, (0, 0)).fetchall()
+            self._local.conn = conn
+        return conn
+
+    def _read(self, sql, params):
+        conn = self._reader()
+        if conn is self.conn and threading.get_ident() != self._owner:
+            # in-memory database read from another thread: share self.conn, but under
+            # the write lock so an open write transaction is never visible
+            with self._write_lock:
+                return conn.execute(sql, params).fetchall()
+        return conn.execute(sql, params).fetchall()
+
+    @contextmanager
+    def _transaction(self):
+        with self._write_lock:
+            self.conn.execute('BEGIN')
+            try:
+                yield
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.conn.execute('COMMIT')
+
     def _create_tables(self):
-        c = self.conn.cursor()
+        c = self.conn
         c.execute('''
             CREATE TABLE IF NOT EXISTS invoices (
                 id INTEGER PRIMARY KEY,
@@ -61,7 +205,7 @@ class InvoiceDB:
                 type TEXT,
                 customer TEXT,
                 items TEXT,
-                total REAL,
+                total_cents INTEGER,
                 notes TEXT
             )
         ''')
@@ -71,137 +215,263 @@ class InvoiceDB:
                 v TEXT
             )
         ''')
+        # indexes for the list_invoices filter / sort workload
+        c.execute('CREATE INDEX IF NOT EXISTS idx_invoices_date ON invoices(date DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_invoices_type_date ON invoices(type, date DESC)')
+        c.execute('CREATE INDEX IF NOT EXISTS idx_invoices_customer ON invoices(customer COLLATE NOCASE)')
         # initialize last_invoice if missing
         c.execute("INSERT OR IGNORE INTO meta (k,v) VALUES ('last_invoice', '0')")
-        self.conn.commit()
+        self._migrate()
+
+    def _migrate(self):
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version < 1:
+            # v1: totals move from the REAL `total` column to exact INTEGER cents. Only
+            # databases created before total_cents existed need the copy; the legacy
+            # `total` column is left in place but frozen - never read or written again.
+            cols = {r['name'] for r in self.conn.execute('PRAGMA table_info(invoices)')}
+            with self._transaction():
+                if 'total_cents' not in cols:
+                    self.conn.execute('ALTER TABLE invoices ADD COLUMN total_cents INTEGER')
+                    self.conn.execute('UPDATE invoices SET total_cents=CAST(ROUND(total*100) AS INTEGER)')
+                self.conn.execute('PRAGMA user_version=1')
+        if version < 2:
+            # v2: trigram FTS5 index over the searchable text columns, kept in sync by triggers
+            try:
+                with self._transaction():
+                    self._create_fts()
+                    self.conn.execute('PRAGMA user_version=2')
+            except sqlite3.OperationalError:
+                # SQLite without FTS5 or the trigram tokenizer (< 3.34); list_invoices keeps using LIKE
+                pass
+        if version < 3:
+            # v3: rewrite legacy newline-separated items as the JSON list format
+            with self._transaction():
+                rows = self.conn.execute("SELECT id, items FROM invoices WHERE items <> ''").fetchall()
+                self.conn.executemany('UPDATE invoices SET items=? WHERE id=?', [
+                    (dump_items(r['items'].split('\n')), r['id'])
+                    for r in rows if not _is_json_list(r['items'])
+                ])
+                self.conn.execute('PRAGMA user_version=3')
+        self.has_fts = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='table' AND name='invoices_fts'").fetchone() is not None
+
+    def _create_fts(self):
+        c = self.conn
+        c.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS invoices_fts USING fts5(
+                customer, invoice_no, items, notes,
+                content='invoices', content_rowid='id', tokenize='trigram'
+            )
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS invoices_fts_ai AFTER INSERT ON invoices BEGIN
+                INSERT INTO invoices_fts (rowid, customer, invoice_no, items, notes)
+                VALUES (new.id, new.customer, new.invoice_no, new.items, new.notes);
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS invoices_fts_ad AFTER DELETE ON invoices BEGIN
+                INSERT INTO invoices_fts (invoices_fts, rowid, customer, invoice_no, items, notes)
+                VALUES ('delete', old.id, old.customer, old.invoice_no, old.items, old.notes);
+            END
+        ''')
+        c.execute('''
+            CREATE TRIGGER IF NOT EXISTS invoices_fts_au AFTER UPDATE ON invoices BEGIN
+                INSERT INTO invoices_fts (invoices_fts, rowid, customer, invoice_no, items, notes)
+                VALUES ('delete', old.id, old.customer, old.invoice_no, old.items, old.notes);
+                INSERT INTO invoices_fts (rowid, customer, invoice_no, items, notes)
+                VALUES (new.id, new.customer, new.invoice_no, new.items, new.notes);
+            END
+        ''')
+        # index rows that existed before the FTS table
+        c.execute("INSERT INTO invoices_fts (invoices_fts) VALUES ('rebuild')")
 
     def next_invoice_no(self, prefix='INV'):
-        c = self.conn.cursor()
-        c.execute("SELECT v FROM meta WHERE k='last_invoice'")
-        last = int(c.fetchone()[0])
-        last += 1
-        c.execute("UPDATE meta SET v=? WHERE k='last_invoice'", (str(last),))
-        self.conn.commit()
-        return f"{prefix}-{last:05d}"
-
-    def add_invoice(self, invoice_no, date, itype, customer, items_text, total, notes):
-        c = self.conn.cursor()
-        c.execute('''INSERT INTO invoices (invoice_no, date, type, customer, items, total, notes)
-                     VALUES (?,?,?,?,?,?,?)''', (invoice_no, date, itype, customer, items_text, total, notes))
-        self.conn.commit()
+        return self.reserve_invoice_nos(1, prefix)[0]
+
+    def reserve_invoice_nos(self, n, prefix='INV'):
+        # allocate n consecutive invoice numbers with a single counter update
+        if HAS_RETURNING:
+            # one atomic statement; fetchall() so the statement finishes and commits
+            with self._write_lock:
+                rows = self.conn.execute("UPDATE meta SET v=CAST(v AS INTEGER)+? WHERE k='last_invoice' RETURNING v",
+                                         (n,)).fetchall()
+            last = int(rows[0]['v']) - n
+        else:
+            with self._transaction():
+                last = int(self.conn.execute("SELECT v FROM meta WHERE k='last_invoice'").fetchone()['v'])
+                self.conn.execute("UPDATE meta SET v=? WHERE k='last_invoice'", (str(last + n),))
+        return [f"{prefix}-{last + i:05d}" for i in range(1, n + 1)]
+
+    def add_invoice(self, invoice_no, date, itype, customer, items_text, total_cents, notes):
+        with self._write_lock:
+            c = self.conn.execute('''INSERT INTO invoices (invoice_no, date, type, customer, items, total_cents, notes)
+                                     VALUES (?,?,?,?,?,?,?)''', (invoice_no, date, itype, customer, items_text, total_cents, notes))
         return c.lastrowid
 
-    def update_invoice(self, id_, invoice_no, date, itype, customer, items_text, total, notes):
-        c = self.conn.cursor()
-        c.execute('''UPDATE invoices SET invoice_no=?, date=?, type=?, customer=?, items=?, total=?, notes=? WHERE id=?''',
-                  (invoice_no, date, itype, customer, items_text, total, notes, id_))
-        self.conn.commit()
+    def add_invoices_bulk(self, rows):
+        # rows: iterable of (invoice_no, date, type, customer, items, total_cents, notes)
+        with self._transaction():
+            self.conn.executemany('''INSERT INTO invoices (invoice_no, date, type, customer, items, total_cents, notes)
+                                     VALUES (?,?,?,?,?,?,?)''', rows)
+
+    def update_invoice(self, id_, invoice_no, date, itype, customer, items_text, total_cents, notes):
+        with self._write_lock:
+            self.conn.execute('''UPDATE invoices SET invoice_no=?, date=?, type=?, customer=?, items=?, total_cents=?, notes=? WHERE id=?''',
+                              (invoice_no, date, itype, customer, items_text, total_cents, notes, id_))
 
     def delete_invoice(self, id_):
-        c = self.conn.cursor()
-        c.execute('DELETE FROM invoices WHERE id=?', (id_,))
-        self.conn.commit()
+        with self._write_lock:
+            self.conn.execute('DELETE FROM invoices WHERE id=?', (id_,))
 
-    def list_invoices(self, filters=None):
+    def delete_invoices(self, ids):
+        with self._transaction():
+            self.conn.executemany('DELETE FROM invoices WHERE id=?', [(i,) for i in ids])
+
+    def list_invoices(self, filters=None, limit=None, offset=0):
         filters = filters or {}
-        q = 'SELECT id, invoice_no, date, type, customer, total FROM invoices'
-        conds = []
-        params = []
-        if 'type' in filters and filters['type']:
-            conds.append('type=?')
-            params.append(filters['type'])
-        if 'customer' in filters and filters['customer']:
-            conds.append('customer LIKE ?')
-            params.append('%' + filters['customer'] + '%')
-        if 'invoice_no' in filters and filters['invoice_no']:
-            conds.append('invoice_no LIKE ?')
-            params.append('%' + filters['invoice_no'] + '%')
-        if 'date_from' in filters and filters['date_from']:
-            conds.append('date(date) >= date(?)')
-            params.append(filters['date_from'])
-        if 'date_to' in filters and filters['date_to']:
-            conds.append('date(date) <= date(?)')
-            params.append(filters['date_to'])
-        if conds:
-            q += ' WHERE ' + ' AND '.join(conds)
-        q += ' ORDER BY date(date) DESC'
-        c = self.conn.cursor()
-        c.execute(q, params)
-        return c.fetchall()
+        if limit is not None and not any(filters.values()):
+            return self._read(self._SQL_LIST_ALL, (limit, offset))
+        values = {}
+        fts_terms = []
+        if filters.get('type'):
+            values['type'] = filters['type']
+        customer = filters.get('customer')
+        if customer:
+            # an explicit trailing wildcard (e.g. 'Acme%') asks for an anchored prefix
+            # search, which can use idx_invoices_customer; any other % is literal
+            body = customer[:-1]
+            if customer.endswith('%') and body and '%' not in body:
+                values['customer'] = _like_escape(body) + '%'
+            elif self.has_fts and _fts_searchable(customer):
+                fts_terms.append(_fts_substring_query('customer', customer))
+            else:
+                values['customer'] = '%' + _like_escape(customer) + '%'
+        invoice_no = filters.get('invoice_no')
+        if invoice_no:
+            if self.has_fts and _fts_searchable(invoice_no):
+                fts_terms.append(_fts_substring_query('invoice_no', invoice_no))
+            else:
+                values['invoice_no'] = '%' + _like_escape(invoice_no) + '%'
+        if fts_terms:
+            values['fts'] = ' AND '.join(fts_terms)
+        if filters.get('date_from'):
+            values['date_from'] = filters['date_from']
+        if filters.get('date_to'):
+            values['date_to'] = filters['date_to']
+        shape = frozenset(values)
+        params = [values[k] for k, _ in LIST_FILTER_CONDS if k in shape]
+        if limit is not None:
+            params += [limit, offset]
+        return self._read(_build_list_sql(shape, limit is not None), params)
 
     def get_invoice(self, id_):
-        c = self.conn.cursor()
-        c.execute('SELECT * FROM invoices WHERE id=?', (id_,))
-        return c.fetchone()
+        return self.conn.execute(f'SELECT {INVOICE_COLUMNS} FROM invoices WHERE id=?', (id_,)).fetchone()
+
+    def _full_rows_cursor(self, ids=None):
+        # lazy cursor over full invoice rows; all invoices when ids is None
+        if ids is None:
+            return self.conn.execute(f'SELECT {INVOICE_COLUMNS} FROM invoices ORDER BY date DESC, id')
+        placeholders = ','.join('?' * len(ids))
+        return self.conn.execute(f'SELECT {INVOICE_COLUMNS} FROM invoices WHERE id IN ({placeholders}) ORDER BY date DESC, id', list(ids))
 
-    def export_csv(self, filepath, invoices_rows):
-        # invoices_rows is list of full rows or tuples
-        # If pandas available, use it
+    def export_csv(self, filepath, ids=None):
+        # streams rows straight from the cursor into the file; returns the row count
         headers = ['id', 'invoice_no', 'date', 'type', 'customer', 'items', 'total', 'notes']
-        if PANDAS_AVAILABLE:
-            df = pd.DataFrame(invoices_rows, columns=headers)
-            df.to_csv(filepath, index=False)
-        else:
-            with open(filepath, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(headers)
-                for r in invoices_rows:
-                    writer.writerow(r)
+        with open(filepath, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(headers)
+            count = 0
+
+            def rows():
+                # items are stored as JSON and totals as cents; export them as one
+                # line per item and a decimal amount. SELECT cursors report
+                # rowcount -1, so count rows as they are written.
+                nonlocal count
+                for r in self._full_rows_cursor(ids):
+                    count += 1
+                    yield r[:5] + ('\n'.join(load_items(r['items'])), format_cents(r['total_cents']), r['notes'])
+
+            writer.writerows(rows())
+        return count
 
 # --- PDF generation helper (very simple layout) ---
 
 def generate_pdf_invoice(invoice_row, output_path):
     if not REPORTLAB_AVAILABLE:
         raise RuntimeError('reportlab is not installed')
-    # invoice_row expected: (id, invoice_no, date, type, customer, items, total, notes)
-    c = rcanvas.Canvas(output_path, pagesize=A4)
-    width, height = A4
+    # invoice_row: sqlite3.Row (or mapping) with the invoices table columns
+    # platypus lays out the flowables and handles page breaks for long item/note lists
     margin = 40
-    y = height - margin
-    c.setFont('Helvetica-Bold', 16)
-    c.drawString(margin, y, f"INVOICE: {invoice_row[1]}")
-    c.setFont('Helvetica', 10)
-    y -= 25
-    c.drawString(margin, y, f"Date: {invoice_row[2]}")
-    c.drawString(width/2, y, f"Type: {invoice_row[3]}")
-    y -= 20
-    c.drawString(margin, y, f"Customer: {invoice_row[4]}")
-    y -= 30
-    c.setFont('Helvetica-Bold', 12)
-    c.drawString(margin, y, 'Items:')
-    y -= 15
-    c.setFont('Helvetica', 10)
-    items = invoice_row[5].split('\n') if invoice_row[5] else []
-    for it in items:
-        if y < 100:
-            c.showPage()
-            y = height - margin
-        c.drawString(margin+10, y, '- ' + it)
-        y -= 14
-    y -= 10
-    c.setFont('Helvetica-Bold', 12)
-    c.drawString(margin, y, f"Total: {invoice_row[6]:.2f}")
-    y -= 25
-    c.setFont('Helvetica', 9)
-    c.drawString(margin, y, 'Notes:')
-    y -= 12
-    note_lines = invoice_row[7].split('\n') if invoice_row[7] else []
-    for ln in note_lines:
-        if y < 100:
-            c.showPage()
-            y = height - margin
-        c.drawString(margin+6, y, ln)
-        y -= 12
-    c.showPage()
-    c.save()
+    # render into memory and write the file in one go
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=A4, leftMargin=margin, rightMargin=margin,
+                            topMargin=margin, bottomMargin=margin)
+    title = ParagraphStyle('title', fontName='Helvetica-Bold', fontSize=16, leading=20)
+    heading = ParagraphStyle('heading', fontName='Helvetica-Bold', fontSize=12, leading=15)
+    body = ParagraphStyle('body', fontName='Helvetica', fontSize=10, leading=14)
+    small = ParagraphStyle('small', fontName='Helvetica', fontSize=9, leading=12)
+    item_style = ParagraphStyle('items', parent=body, leftIndent=10)
+    note_style = ParagraphStyle('notes', parent=small, leftIndent=6)
+    items = load_items(invoice_row['items'])
+    story = [
+        Paragraph(escape(f"INVOICE: {invoice_row['invoice_no']}"), title),
+        Spacer(0, 8),
+        Table([[f"Date: {invoice_row['date']}", f"Type: {invoice_row['type']}"]],
+              colWidths=[doc.width / 2] * 2,
+              style=[('FONT', (0, 0), (-1, -1), 'Helvetica', 10),
+                     ('LEFTPADDING', (0, 0), (-1, -1), 0)]),
+        Paragraph(escape(f"Customer: {invoice_row['customer']}"), body),
+        Spacer(0, 16),
+        Paragraph('Items:', heading),
+    ]
+    # one wrapping Paragraph per line; Preformatted would run long lines off the page
+    story += [Paragraph(escape('- ' + it), item_style) for it in items]
+    story += [
+        Spacer(0, 10),
+        Paragraph(escape(f"Total: {format_cents(invoice_row['total_cents'])}"), heading),
+        Spacer(0, 10),
+        Paragraph('Notes:', small),
+    ]
+    if invoice_row['notes']:
+        story += [Paragraph(escape(ln), note_style) if ln.strip() else Spacer(0, note_style.leading)
+                  for ln in invoice_row['notes'].split('\n')]
+    doc.build(story)
+    Path(output_path).write_bytes(buf.getvalue())
 
 # --- Tkinter GUI ---
 class InvoiceApp:
+    TREE_PACK = dict(side=LEFT, fill=BOTH, expand=True)
+    PAGE_SIZE = 200
+    # column -> (width, anchor)
+    TREE_COLUMNS = {
+        'id': (60, E),
+        'invoice_no': (120, W),
+        'date': (100, W),
+        'type': (90, W),
+        'customer': (300, W),
+        'total': (100, E),
+    }
+
     def __init__(self, root):
         self.root = root
         root.title('Invoice Manager')
         root.geometry('1000x600')
         self.db = InvoiceDB()
+        # paging state for the invoice list; see load_invoices
+        self._filters = {}
+        self._offset = 0
+        self._has_more = False
+        self._page_pending = False
+        self._search_job = None
+        # background loading: start_fetch posts requests to the loader thread,
+        # which posts (gen, offset, reset, rows) back on self._results
+        self._requests = queue.Queue()
+        self._results = queue.Queue()
+        self._load_gen = 0
+        self._inflight = 0
+        threading.Thread(target=self.loader_loop, daemon=True).start()
         self.create_widgets()
         self.load_invoices()
 
@@ -241,7 +511,7 @@ class InvoiceApp:
         self.date_to = Entry(top, width=12)
         self.date_to.pack(side=LEFT)
 
-        search_btn = Button(top, text='Search', command=self.load_invoices)
+        search_btn = Button(top, text='Search', command=self.schedule_search)
         search_btn.pack(side=LEFT, padx=(8,0))
 
         reset_btn = Button(top, text='Reset', command=self.reset_filters)
@@ -249,16 +519,20 @@ class InvoiceApp:
 
         # main Treeview
         columns = ('id', 'invoice_no', 'date', 'type', 'customer', 'total')
-        self.tree = ttk.Treeview(self.root, columns=columns, show='headings')
+        tree_frm = Frame(self.root)
+        tree_frm.pack(fill=BOTH, expand=True, padx=8, pady=6)
+        self.vsb = ttk.Scrollbar(tree_frm, orient=VERTICAL)
+        self.vsb.pack(side=RIGHT, fill=Y)
+        self.tree = ttk.Treeview(tree_frm, columns=columns, show='headings',
+                                 yscrollcommand=self.on_tree_yscroll)
+        self.vsb.configure(command=self.tree.yview)
+        self.tree.configure(displaycolumns=columns)
+        # fixed widths so Tk does not re-measure columns on every insert
         for col in columns:
             self.tree.heading(col, text=col.title())
-            if col == 'customer':
-                self.tree.column(col, width=300)
-            elif col == 'items':
-                self.tree.column(col, width=250)
-            else:
-                self.tree.column(col, width=100)
-        self.tree.pack(fill=BOTH, expand=True, padx=8, pady=6)
+            width, anchor = self.TREE_COLUMNS[col]
+            self.tree.column(col, width=width, anchor=anchor, stretch=False)
+        self.tree.pack(**self.TREE_PACK)
         self.tree.bind('<Double-1>', self.on_tree_double)
 
         # bottom buttons
@@ -271,6 +545,16 @@ class InvoiceApp:
         sample_btn = Button(bottom, text='Insert Sample Data', command=self.insert_sample)
         sample_btn.pack(side=LEFT, padx=(6,0))
 
+    def schedule_search(self):
+        # debounce repeated Search clicks into a single reload
+        if self._search_job is not None:
+            self.root.after_cancel(self._search_job)
+        self._search_job = self.root.after(150, self.run_search)
+
+    def run_search(self):
+        self._search_job = None
+        self.load_invoices()
+
     def reset_filters(self):
         self.type_var.set('')
         self.customer_search.delete(0, END)
@@ -289,12 +573,82 @@ class InvoiceApp:
         }
 
     def load_invoices(self):
-        for r in self.tree.get_children():
-            self.tree.delete(r)
-        rows = self.db.list_invoices(self.build_filters())
+        # (re)load the first page; further pages are fetched as the list is scrolled
+        self._filters = self.build_filters()
+        self._load_gen += 1
+        self._has_more = False
+        self._page_pending = False
+        self.start_fetch(0, reset=True)
+
+    def start_fetch(self, offset, reset):
+        # the DB query runs on the loader thread; rows come back through self._results
+        self._requests.put((self._load_gen, dict(self._filters), offset, reset))
+        self._inflight += 1
+        if self._inflight == 1:
+            self.root.after(50, self.drain_results)
+
+    def loader_loop(self):
+        # loader thread: database work only, never touch Tk from here. Being
+        # long-lived, it keeps one read connection (InvoiceDB._reader) and its
+        # statement cache for the life of the app.
+        while True:
+            gen, filters, offset, reset = self._requests.get()
+            if gen != self._load_gen:
+                # superseded by a newer search; drain_results drops it anyway
+                rows = []
+            else:
+                try:
+                    rows = self.db.list_invoices(filters, limit=self.PAGE_SIZE, offset=offset)
+                except Exception as e:
+                    rows = e
+            self._results.put((gen, offset, reset, rows))
+
+    def drain_results(self):
+        while True:
+            try:
+                gen, offset, reset, rows = self._results.get_nowait()
+            except queue.Empty:
+                break
+            self._inflight -= 1
+            # drop results of a search that has since been replaced
+            if gen == self._load_gen:
+                self.apply_page(offset, reset, rows)
+        if self._inflight:
+            self.root.after(50, self.drain_results)
+
+    def apply_page(self, offset, reset, rows):
+        self._page_pending = False
+        if isinstance(rows, Exception):
+            messagebox.showerror('Error', str(rows))
+            return
+        self._offset = offset + len(rows)
+        self._has_more = len(rows) == self.PAGE_SIZE
+        if reset:
+            self.tree.delete(*self.tree.get_children())
+            # hide the tree while inserting so it is not redrawn per row
+            self.tree.pack_forget()
+            self.insert_rows(rows)
+            self.tree.pack(**self.TREE_PACK)
+        else:
+            self.insert_rows(rows)
+
+    def insert_rows(self, rows):
         for row in rows:
-            # row: (id, invoice_no, date, type, customer, total)
-            self.tree.insert('', END, values=row)
+            # row: (id, invoice_no, date, type, customer, total_cents)
+            self.tree.insert('', END, values=tuple(row[:5]) + (format_cents(row['total_cents']),))
+
+    def on_tree_yscroll(self, first, last):
+        self.vsb.set(first, last)
+        if self._has_more and not self._page_pending and float(last) > 0.9:
+            self._page_pending = True
+            self.root.after_idle(self.load_next_page)
+
+    def load_next_page(self):
+        # the view may have moved (or the list been reloaded) since this was scheduled
+        if self._has_more and self.tree.yview()[1] > 0.9:
+            self.start_fetch(self._offset, reset=False)
+        else:
+            self._page_pending = False
 
     def open_add_window(self):
         InvoiceEditor(self.root, self.db, on_save=self.load_invoices)
@@ -316,31 +670,30 @@ class InvoiceApp:
         if not sel:
             messagebox.showinfo('No selection', 'Please select an invoice to delete')
             return
-        item = self.tree.item(sel[0])['values']
-        id_ = item[0]
-        if messagebox.askyesno('Confirm delete', f'Delete invoice {item[1]}?'):
-            self.db.delete_invoice(id_)
+        items = [self.tree.item(s)['values'] for s in sel]
+        if len(items) == 1:
+            prompt = f'Delete invoice {items[0][1]}?'
+        else:
+            prompt = f'Delete {len(items)} selected invoices?'
+        if messagebox.askyesno('Confirm delete', prompt):
+            self.db.delete_invoices([item[0] for item in items])
             self.load_invoices()
 
     def export_csv(self):
         sel = self.tree.selection()
         if sel:
             ids = [self.tree.item(s)['values'][0] for s in sel]
-            rows = [self.db.get_invoice(id_) for id_ in ids]
         else:
             # export all
-            # fetch full rows
-            c = self.db.conn.cursor()
-            c.execute('SELECT * FROM invoices ORDER BY date(date) DESC')
-            rows = c.fetchall()
-        if not rows:
-            messagebox.showinfo('No data', 'No invoices to export')
-            return
+            ids = None
+            if self.db.conn.execute('SELECT 1 FROM invoices LIMIT 1').fetchone() is None:
+                messagebox.showinfo('No data', 'No invoices to export')
+                return
         filepath = filedialog.asksaveasfilename(defaultextension='.csv', filetypes=[('CSV files','*.csv')])
         if not filepath:
             return
-        self.db.export_csv(filepath, rows)
-        messagebox.showinfo('Exported', f'Exported {len(rows)} invoices to {filepath}')
+        count = self.db.export_csv(filepath, ids)
+        messagebox.showinfo('Exported', f'Exported {count} invoices to {filepath}')
 
     def generate_pdf_selected(self):
         if not REPORTLAB_AVAILABLE:
@@ -358,23 +711,30 @@ class InvoiceApp:
         fd, tmpf = tempfile.mkstemp(suffix='.pdf')
         os.close(fd)
         try:
-            generate_pdf_invoice(row, tmpf)
+            # write under a temporary name so the browser never sees a partial file
+            generate_pdf_invoice(row, tmpf + '.part')
+            os.replace(tmpf + '.part', tmpf)
             webbrowser.open('file://' + tmpf)
         except Exception as e:
+            # don't leave the empty mkstemp file or a partial PDF behind
+            for path in (tmpf, tmpf + '.part'):
+                with suppress(FileNotFoundError):
+                    os.remove(path)
             messagebox.showerror('Error', str(e))
 
     def insert_sample(self):
         # add some sample invoices
         try:
-            for i in range(3):
-                inv_no = self.db.next_invoice_no('SAMPLE')
-                date = datetime.now().strftime('%Y-%m-%d')
+            date = datetime.now().strftime('%Y-%m-%d')
+            items = dump_items(['Item A x1 - 100', 'Item B x2 - 200'])
+            total_cents = 30000
+            notes = 'Sample invoice created for testing'
+            rows = []
+            for i, inv_no in enumerate(self.db.reserve_invoice_nos(3, 'SAMPLE')):
                 itype = 'Outward' if i%2==0 else 'Inward'
                 customer = f'Customer {i+1}'
-                items = f'Item A x1 - 100\nItem B x2 - 200'
-                total = 300.0
-                notes = 'Sample invoice created for testing'
-                self.db.add_invoice(inv_no, date, itype, customer, items, total, notes)
+                rows.append((inv_no, date, itype, customer, items, total_cents, notes))
+            self.db.add_invoices_bulk(rows)
             messagebox.showinfo('Inserted', 'Sample invoices inserted')
             self.load_invoices()
         except Exception as e:
@@ -445,25 +805,24 @@ class InvoiceEditor:
             messagebox.showerror('Not found', 'Invoice not found')
             self.top.destroy()
             return
-        # row: (id, invoice_no, date, type, customer, items, total, notes)
-        self.invoice_no_var.set(row[1])
-        self.date_var.set(row[2])
-        self.type_var.set(row[3])
-        self.customer_var.set(row[4])
+        self.invoice_no_var.set(row['invoice_no'])
+        self.date_var.set(row['date'])
+        self.type_var.set(row['type'])
+        self.customer_var.set(row['customer'])
         self.items_txt.delete('1.0', END)
-        self.items_txt.insert(END, row[5] or '')
-        self.total_var.set(str(row[6] or ''))
+        self.items_txt.insert(END, '\n'.join(load_items(row['items'])))
+        self.total_var.set(format_cents(row['total_cents']))
         self.notes_txt.delete('1.0', END)
-        self.notes_txt.insert(END, row[7] or '')
+        self.notes_txt.insert(END, row['notes'] or '')
 
     def save(self):
         inv_no = self.invoice_no_var.get().strip()
         date = self.date_var.get().strip()
         itype = self.type_var.get().strip()
         customer = self.customer_var.get().strip()
-        items = self.items_txt.get('1.0', END).strip()
+        items = dump_items(self.items_txt.get('1.0', END).strip().splitlines())
         try:
-            total = float(self.total_var.get().strip() or 0.0)
+            total_cents = parse_cents(self.total_var.get().strip())
         except ValueError:
             messagebox.showerror('Invalid total', 'Please enter a valid numeric total')
             return
@@ -473,9 +832,9 @@ class InvoiceEditor:
             return
         try:
             if self.invoice_id:
-                self.db.update_invoice(self.invoice_id, inv_no, date, itype, customer, items, total, notes)
+                self.db.update_invoice(self.invoice_id, inv_no, date, itype, customer, items, total_cents, notes)
             else:
-                self.db.add_invoice(inv_no, date, itype, customer, items, total, notes)
+                self.db.add_invoice(inv_no, date, itype, customer, items, total_cents, notes)
             messagebox.showinfo('Saved', 'Invoice saved')
             if self.on_save:
                 self.on_save()